@@ -6,20 +6,43 @@ This script tests all endpoints of the Weather Prediction API with various scena
 including success cases, error cases, and edge cases.
 """
 
-import requests
+import aiohttp
+import asyncio
 import json
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional
 import sys
 
+class APIResponse(NamedTuple):
+    """Status and body of a completed request, read before the connection is released"""
+    status_code: int
+    text: str
+    
+    def json(self):
+        return json.loads(self.text)
+
 class WeatherAPITester:
-    def __init__(self, base_url: str = "http://localhost:8001"):
+    def __init__(self, base_url: str = "http://localhost:8001", max_connections: int = 32):
         self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.session: Optional[aiohttp.ClientSession] = None
         self.test_results = []
         self.passed = 0
         self.failed = 0
     
+    async def fetch(self, path: str, timeout: int) -> APIResponse:
+        """GET a single endpoint over the shared keep-alive session"""
+        async with self.session.get(f"{self.base_url}{path}", timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return APIResponse(response.status, await response.text())
+    
+    async def fetch_all(self, paths: List[str], timeout: int) -> List:
+        """GET several endpoints concurrently, returning each response or the exception it raised"""
+        return await asyncio.gather(
+            *(self.fetch(path, timeout) for path in paths),
+            return_exceptions=True
+        )
+    
     def log_test(self, test_name: str, passed: bool, details: str = ""):
         """Log test results"""
         status = "✅ PASS" if passed else "❌ FAIL"
@@ -38,10 +61,10 @@ class WeatherAPITester:
         else:
             self.failed += 1
     
-    def test_server_connection(self) -> bool:
+    async def test_server_connection(self) -> bool:
         """Test if server is running and accessible"""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=5)
+            response = await self.fetch("/", timeout=5)
             if response.status_code == 200:
                 self.log_test("Server Connection", True, f"Server responding on {self.base_url}")
                 return True
@@ -52,10 +75,10 @@ class WeatherAPITester:
             self.log_test("Server Connection", False, f"Cannot connect to server: {str(e)}")
             return False
     
-    def test_root_endpoint(self):
+    async def test_root_endpoint(self):
         """Test the root endpoint documentation"""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=10)
+            response = await self.fetch("/", timeout=10)
             data = response.json()
             
             # Check required fields
@@ -70,10 +93,10 @@ class WeatherAPITester:
         except Exception as e:
             self.log_test("Root Endpoint", False, f"Error: {str(e)}")
     
-    def test_health_endpoint(self):
+    async def test_health_endpoint(self):
         """Test the health check endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/health/", timeout=10)
+            response = await self.fetch("/health/", timeout=10)
             data = response.json()
             
             # Check health response structure
@@ -93,17 +116,21 @@ class WeatherAPITester:
         except Exception as e:
             self.log_test("Health Check", False, f"Error: {str(e)}")
     
-    def test_rain_prediction_valid_dates(self):
+    async def test_rain_prediction_valid_dates(self):
         """Test rain prediction with valid dates"""
+        today = date.today()
         test_dates = [
-            datetime.now().strftime("%Y-%m-%d"),  # Today
-            (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d"),  # 7 days ago
-            (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d"),  # 3 days from now
+            today.isoformat(),  # Today
+            (today - timedelta(days=7)).isoformat(),  # 7 days ago
+            (today + timedelta(days=3)).isoformat(),  # 3 days from now
         ]
         
-        for test_date in test_dates:
+        responses = await self.fetch_all([f"/predict/rain/?date={test_date}" for test_date in test_dates], timeout=15)
+        
+        for test_date, response in zip(test_dates, responses):
             try:
-                response = requests.get(f"{self.base_url}/predict/rain/?date={test_date}", timeout=15)
+                if isinstance(response, Exception):
+                    raise response
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -126,17 +153,21 @@ class WeatherAPITester:
             except Exception as e:
                 self.log_test(f"Rain Prediction ({test_date})", False, f"Error: {str(e)}")
     
-    def test_precipitation_prediction_valid_dates(self):
+    async def test_precipitation_prediction_valid_dates(self):
         """Test precipitation prediction with valid dates"""
+        today = date.today()
         test_dates = [
-            datetime.now().strftime("%Y-%m-%d"),  # Today
-            (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d"),  # 5 days ago
-            (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d"),  # 2 days from now
+            today.isoformat(),  # Today
+            (today - timedelta(days=5)).isoformat(),  # 5 days ago
+            (today + timedelta(days=2)).isoformat(),  # 2 days from now
         ]
         
-        for test_date in test_dates:
+        responses = await self.fetch_all([f"/predict/precipitation/fall/?date={test_date}" for test_date in test_dates], timeout=15)
+        
+        for test_date, response in zip(test_dates, responses):
             try:
-                response = requests.get(f"{self.base_url}/predict/precipitation/fall/?date={test_date}", timeout=15)
+                if isinstance(response, Exception):
+                    raise response
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -161,7 +192,7 @@ class WeatherAPITester:
             except Exception as e:
                 self.log_test(f"Precipitation Prediction ({test_date})", False, f"Error: {str(e)}")
     
-    def test_invalid_date_formats(self):
+    async def test_invalid_date_formats(self):
         """Test API with invalid date formats"""
         invalid_dates = [
             "2024-13-01",  # Invalid month
@@ -171,10 +202,20 @@ class WeatherAPITester:
             "20-12-2024",  # Wrong order
         ]
         
-        for invalid_date in invalid_dates:
+        responses = await self.fetch_all(
+            [f"/predict/rain/?date={invalid_date}" for invalid_date in invalid_dates]
+            + [f"/predict/precipitation/fall/?date={invalid_date}" for invalid_date in invalid_dates],
+            timeout=10
+        )
+        rain_responses = responses[:len(invalid_dates)]
+        precip_responses = responses[len(invalid_dates):]
+        
+        for invalid_date, rain_response, precip_response in zip(invalid_dates, rain_responses, precip_responses):
             try:
                 # Test rain endpoint
-                response = requests.get(f"{self.base_url}/predict/rain/?date={invalid_date}", timeout=10)
+                response = rain_response
+                if isinstance(response, Exception):
+                    raise response
                 if response.status_code in [400, 422]:
                     self.log_test(f"Invalid Date Rain ({invalid_date})", True, 
                                 f"Correctly rejected with {response.status_code}")
@@ -183,7 +224,9 @@ class WeatherAPITester:
                                 f"Should reject but got {response.status_code}")
                 
                 # Test precipitation endpoint
-                response = requests.get(f"{self.base_url}/predict/precipitation/fall/?date={invalid_date}", timeout=10)
+                response = precip_response
+                if isinstance(response, Exception):
+                    raise response
                 if response.status_code in [400, 422]:
                     self.log_test(f"Invalid Date Precipitation ({invalid_date})", True, 
                                 f"Correctly rejected with {response.status_code}")
@@ -194,16 +237,19 @@ class WeatherAPITester:
             except Exception as e:
                 self.log_test(f"Invalid Date ({invalid_date})", False, f"Error: {str(e)}")
     
-    def test_missing_parameters(self):
+    async def test_missing_parameters(self):
         """Test API endpoints without required parameters"""
         endpoints = [
             "/predict/rain/",
             "/predict/precipitation/fall/"
         ]
         
-        for endpoint in endpoints:
+        responses = await self.fetch_all(endpoints, timeout=10)
+        
+        for endpoint, response in zip(endpoints, responses):
             try:
-                response = requests.get(f"{self.base_url}{endpoint}", timeout=10)
+                if isinstance(response, Exception):
+                    raise response
                 if response.status_code == 422:
                     self.log_test(f"Missing Parameter {endpoint}", True, 
                                 "Correctly rejected missing date parameter")
@@ -214,13 +260,16 @@ class WeatherAPITester:
             except Exception as e:
                 self.log_test(f"Missing Parameter {endpoint}", False, f"Error: {str(e)}")
     
-    def test_api_documentation(self):
+    async def test_api_documentation(self):
         """Test API documentation endpoints"""
         doc_endpoints = ["/docs", "/redoc"]
         
-        for endpoint in doc_endpoints:
+        responses = await self.fetch_all(doc_endpoints, timeout=10)
+        
+        for endpoint, response in zip(doc_endpoints, responses):
             try:
-                response = requests.get(f"{self.base_url}{endpoint}", timeout=10)
+                if isinstance(response, Exception):
+                    raise response
                 if response.status_code == 200:
                     self.log_test(f"Documentation {endpoint}", True, "Documentation accessible")
                 else:
@@ -230,37 +279,42 @@ class WeatherAPITester:
             except Exception as e:
                 self.log_test(f"Documentation {endpoint}", False, f"Error: {str(e)}")
     
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all tests"""
         print("🚀 Starting Weather Prediction API Tests")
         print("=" * 50)
         
-        # Test server connection first
-        if not self.test_server_connection():
-            print("\n❌ Cannot connect to server. Make sure the API is running on", self.base_url)
-            return False
-        
-        print("\n📊 Running API Tests...")
-        
-        # Core functionality tests
-        self.test_root_endpoint()
-        self.test_health_endpoint()
-        
-        # Prediction tests
-        print("\n🌧️  Testing Rain Predictions...")
-        self.test_rain_prediction_valid_dates()
-        
-        print("\n💧 Testing Precipitation Predictions...")
-        self.test_precipitation_prediction_valid_dates()
-        
-        # Error handling tests
-        print("\n🚫 Testing Error Handling...")
-        self.test_invalid_date_formats()
-        self.test_missing_parameters()
-        
-        # Documentation tests
-        print("\n📚 Testing Documentation...")
-        self.test_api_documentation()
+        # One pooled session for the whole run so connections to the API are reused
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+        try:
+            # Test server connection first
+            if not await self.test_server_connection():
+                print("\n❌ Cannot connect to server. Make sure the API is running on", self.base_url)
+                return False
+            
+            print("\n📊 Running API Tests...")
+            
+            # Core functionality tests
+            await self.test_root_endpoint()
+            await self.test_health_endpoint()
+            
+            # Prediction tests
+            print("\n🌧️  Testing Rain Predictions...")
+            await self.test_rain_prediction_valid_dates()
+            
+            print("\n💧 Testing Precipitation Predictions...")
+            await self.test_precipitation_prediction_valid_dates()
+            
+            # Error handling tests
+            print("\n🚫 Testing Error Handling...")
+            await self.test_invalid_date_formats()
+            await self.test_missing_parameters()
+            
+            # Documentation tests
+            print("\n📚 Testing Documentation...")
+            await self.test_api_documentation()
+        finally:
+            await self.session.close()
         
         # Print summary
         print("\n" + "=" * 50)
@@ -289,6 +343,8 @@ def main():
                        help="Base URL of the API (default: http://localhost:8001)")
     parser.add_argument("--production", action="store_true",
                        help="Test production deployment (requires --url)")
+    parser.add_argument("--connections", type=int, default=32,
+                       help="Maximum concurrent connections to the API (default: 32)")
     
     args = parser.parse_args()
     
@@ -308,8 +364,8 @@ def main():
     
     print()
     
-    tester = WeatherAPITester(args.url)
-    success = tester.run_all_tests()
+    tester = WeatherAPITester(args.url, max_connections=args.connections)
+    success = asyncio.run(tester.run_all_tests())
     
     sys.exit(0 if success else 1)
 
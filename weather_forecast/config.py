@@ -0,0 +1,16 @@
+"""
+Model locations shared by the API and the offline export script.
+
+Kept free of heavy imports so scripts can read the paths without loading the API or the models.
+"""
+
+import os
+
+# Configuration - Use environment variables for deployment
+MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
+
+# Model file paths - Use relative paths for deployment
+RAIN_MODEL_PATH = os.path.join(MODELS_DIR, "rain_classifier_best_RandomForest_tuned_topk_20250929_004019.joblib")
+PRECIPITATION_MODEL_PATH = os.path.join(MODELS_DIR, "precipitation_regressor_best_GradientBoosting_20250928_052241.joblib")
+PRECIPITATION_ONNX_PATH = os.path.splitext(PRECIPITATION_MODEL_PATH)[0] + ".onnx"
+PRECIP_ONNX_INPUT = "X"
@@ -0,0 +1,29 @@
+"""
+Export the precipitation regressor to ONNX for faster inference.
+
+Run from the project root after retraining the model:
+
+    python -m weather_forecast.export_onnx
+
+Requires skl2onnx (`pip install skl2onnx`), which the API itself does not need.
+The API picks up the exported file automatically when onnxruntime is installed,
+as long as it is newer than the joblib model.
+"""
+
+import joblib
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+from weather_forecast.config import PRECIPITATION_MODEL_PATH, PRECIPITATION_ONNX_PATH, PRECIP_ONNX_INPUT
+
+def main():
+    model = joblib.load(PRECIPITATION_MODEL_PATH)
+    initial_types = [(PRECIP_ONNX_INPUT, FloatTensorType([None, model.n_features_in_]))]
+    onnx_model = convert_sklearn(model, initial_types=initial_types)
+    
+    with open(PRECIPITATION_ONNX_PATH, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"Exported {PRECIPITATION_MODEL_PATH} -> {PRECIPITATION_ONNX_PATH}")
+
+if __name__ == "__main__":
+    main()
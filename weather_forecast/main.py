@@ -1,13 +1,35 @@
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
-from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from datetime import date, datetime, timedelta
+from functools import wraps
+import asyncio
+import aiohttp
+from cachetools import TTLCache
 import joblib
 import numpy as np
-import requests
 import json
+import operator
 import os
-from typing import Dict
+import re
+from typing import Annotated, Dict, Optional
 import logging
+from pydantic import BeforeValidator
+from sklearn.dummy import DummyClassifier
+
+try:
+    from weather_forecast.config import (
+        RAIN_MODEL_PATH, PRECIPITATION_MODEL_PATH, PRECIPITATION_ONNX_PATH, PRECIP_ONNX_INPUT
+    )
+except ModuleNotFoundError:
+    # Started from inside the package directory (`python main.py`, `uvicorn main:app`)
+    from config import RAIN_MODEL_PATH, PRECIPITATION_MODEL_PATH, PRECIPITATION_ONNX_PATH, PRECIP_ONNX_INPUT
+
+# Optional: ONNX Runtime evaluates the exported precipitation model in native code
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,158 +38,351 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Weather Prediction API",
     description="AI-powered weather forecasting API for Sydney, Australia",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Compress larger JSON bodies (e.g. the root documentation) for gzip-capable clients
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 # Global variables
 rain_model = None
 precipitation_model = None
+rain_constant_prediction: Optional[bool] = None
+precipitation_session = None
+http_session: Optional[aiohttp.ClientSession] = None
 
-# Configuration - Use environment variables for deployment
-MODELS_DIR = os.getenv("MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
+# Configuration
 BASE_URL = "https://archive-api.open-meteo.com/v1/archive"
 CURRENT_URL = "https://api.open-meteo.com/v1/forecast"
 SYDNEY_COORDS = {"latitude": -33.8678, "longitude": 151.2073}
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10)
+HTTP_POOL_LIMIT = 50
+HTTP_KEEPALIVE_SECONDS = 10
+HTTP_DNS_CACHE_SECONDS = 300
+
+# Response caches - settled archive data never changes, while the last few archive
+# days (still being filled in) and forecasts are only stable for minutes
+ARCHIVE_SETTLED_DAYS = 7
+HISTORICAL_CACHE = TTLCache(maxsize=512, ttl=24 * 60 * 60)
+RECENT_HISTORICAL_CACHE = TTLCache(maxsize=64, ttl=10 * 60)
+FORECAST_CACHE = TTLCache(maxsize=64, ttl=10 * 60)
+PREDICTION_CACHE_CONTROL = "public, max-age=600"
+
+# Query dates must be exactly YYYY-MM-DD; Pydantic alone also accepts timestamps and datetimes
+ISO_DATE_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+# In-memory weather window refreshed in the background - opt-in, since every
+# worker process runs its own refresher and polls Open-Meteo regardless of traffic
+BACKGROUND_REFRESH = os.getenv("BACKGROUND_REFRESH") == "1"
+REFRESH_PAST_DAYS = 30
+REFRESH_INTERVAL_SECONDS = 10 * 60
+
+# Model inputs - feature order matches training, defaults fill missing values
+RAIN_FEATURE_ORDER = (
+    "temperature_2m_max", "temperature_2m_min", "temperature_2m_mean",
+    "relative_humidity_2m_max", "relative_humidity_2m_min",
+    "pressure_msl_mean", "wind_speed_10m_max", "wind_speed_10m_mean",
+    "wind_direction_10m_dominant", "precipitation_sum", "rain_sum",
+    "shortwave_radiation_sum", "daylight_duration"
+)
+RAIN_DEFAULTS = {
+    "temperature_2m_max": 20.0, "temperature_2m_min": 15.0, "temperature_2m_mean": 17.5,
+    "relative_humidity_2m_max": 80.0, "relative_humidity_2m_min": 60.0,
+    "pressure_msl_mean": 1013.25, "wind_speed_10m_max": 10.0, "wind_speed_10m_mean": 5.0,
+    "wind_direction_10m_dominant": 180.0, "precipitation_sum": 0.0, "rain_sum": 0.0,
+    "shortwave_radiation_sum": 10.0, "daylight_duration": 12.0
+}
+RAIN_FEATURE_GETTER = operator.itemgetter(*RAIN_FEATURE_ORDER)
+
+PRECIP_FEATURE_ORDER = (
+    "temperature_2m", "relative_humidity_2m", "dew_point_2m",
+    "precipitation", "rain", "pressure_msl", "cloud_cover",
+    "wind_speed_10m", "wind_direction_10m", "shortwave_radiation",
+    "surface_pressure", "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high"
+)
+PRECIP_DEFAULTS = {
+    "temperature_2m": 18.0, "relative_humidity_2m": 70.0, "dew_point_2m": 12.0,
+    "precipitation": 0.0, "rain": 0.0, "pressure_msl": 1013.25, "cloud_cover": 50.0,
+    "wind_speed_10m": 8.0, "wind_direction_10m": 180.0, "shortwave_radiation": 200.0,
+    "surface_pressure": 1015.0, "cloud_cover_low": 30.0, "cloud_cover_mid": 20.0, "cloud_cover_high": 10.0
+}
+PRECIP_FEATURE_GETTER = operator.itemgetter(*PRECIP_FEATURE_ORDER)
+
+# Open-Meteo variables per section - daily feeds the rain model, hourly the precipitation model
+HISTORICAL_VARIABLES = {"daily": RAIN_FEATURE_ORDER, "hourly": PRECIP_FEATURE_ORDER}
+FORECAST_VARIABLES = {
+    "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"],
+    "hourly": ["temperature_2m", "relative_humidity_2m", "precipitation"]
+}
+FORECAST_PARAMS = {
+    **SYDNEY_COORDS,
+    "timezone": "Australia/Sydney",
+    "forecast_days": 14
+}
 
-# Model file paths - Use relative paths for deployment
-RAIN_MODEL_PATH = os.path.join(MODELS_DIR, "rain_classifier_best_RandomForest_tuned_topk_20250929_004019.joblib")
-PRECIPITATION_MODEL_PATH = os.path.join(MODELS_DIR, "precipitation_regressor_best_GradientBoosting_20250928_052241.joblib")
+def cached_by_date(cache: TTLCache):
+    """Serve repeat calls for the same date and section from a TTL cache instead of the network"""
+    def decorator(fetch):
+        @wraps(fetch)
+        async def wrapper(input_date: date, section: str) -> Dict:
+            key = (input_date, section)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            result = await fetch(input_date, section)
+            cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
+def require_iso_date(value):
+    """Reject anything but a YYYY-MM-DD string before Pydantic parses it as a date"""
+    if isinstance(value, str) and ISO_DATE_PATTERN.fullmatch(value):
+        return value
+    raise ValueError("Date must be in YYYY-MM-DD format")
+
+IsoDate = Annotated[date, BeforeValidator(require_iso_date)]
 
 class WeatherDataFetcher:
     
     @staticmethod
-    def fetch_weather_for_date(input_date: str) -> Dict:
-        date_obj = datetime.strptime(input_date, "%Y-%m-%d")
-        current_date = datetime.now()
+    async def _get_json(url: str, params: Dict) -> Dict:
+        """GET a URL on the shared session and decode the JSON body"""
+        # aiohttp only accepts scalar query values; Open-Meteo takes comma-separated lists
+        query = {key: ",".join(value) if isinstance(value, (list, tuple)) else value for key, value in params.items()}
+        async with http_session.get(url, params=query) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    @staticmethod
+    async def fetch_daily_for_date(input_date: date, today: date) -> Dict:
+        """Daily features for the rain model"""
+        return await WeatherDataFetcher._fetch_features(input_date, today, "daily")
+    
+    @staticmethod
+    async def fetch_hourly_for_date(input_date: date, today: date) -> Dict:
+        """First-hour features for the precipitation model"""
+        return await WeatherDataFetcher._fetch_features(input_date, today, "hourly")
+    
+    @staticmethod
+    async def _fetch_features(input_date: date, today: date, section: str) -> Dict:
+        snapshot = weather_refresher.get(input_date)
+        if snapshot is not None:
+            return snapshot[f"{section}_features"]
         
         # Determine if we need historical or forecast data
-        if date_obj.date() <= current_date.date():
-            return WeatherDataFetcher._fetch_historical_data(input_date)
+        if input_date <= today - timedelta(days=ARCHIVE_SETTLED_DAYS):
+            return await WeatherDataFetcher._fetch_settled_historical_data(input_date, section)
+        elif input_date <= today:
+            return await WeatherDataFetcher._fetch_recent_historical_data(input_date, section)
         else:
-            return WeatherDataFetcher._fetch_forecast_data(input_date)
+            return await WeatherDataFetcher._fetch_forecast_data(input_date, section)
+    
+    @staticmethod
+    @cached_by_date(HISTORICAL_CACHE)
+    async def _fetch_settled_historical_data(input_date: date, section: str) -> Dict:
+        """Archive days old enough to be final"""
+        return await WeatherDataFetcher._fetch_historical_data(input_date, section)
     
     @staticmethod
-    def _fetch_historical_data(input_date: str) -> Dict:
+    @cached_by_date(RECENT_HISTORICAL_CACHE)
+    async def _fetch_recent_historical_data(input_date: date, section: str) -> Dict:
+        """Recent archive days, which may still have missing values filled in later"""
+        return await WeatherDataFetcher._fetch_historical_data(input_date, section)
+    
+    @staticmethod
+    async def _fetch_historical_data(input_date: date, section: str) -> Dict:
         """Fetch historical weather data"""
         try:
-            # Daily features for rain prediction
-            daily_params = {
+            params = {
                 **SYDNEY_COORDS,
-                "start_date": input_date,
-                "end_date": input_date,
-                "daily": [
-                    "temperature_2m_max", "temperature_2m_min", "temperature_2m_mean",
-                    "relative_humidity_2m_max", "relative_humidity_2m_min",
-                    "pressure_msl_mean", "wind_speed_10m_max", "wind_speed_10m_mean",
-                    "wind_direction_10m_dominant", "precipitation_sum", "rain_sum",
-                    "shortwave_radiation_sum", "daylight_duration"
-                ],
+                "start_date": input_date.isoformat(),
+                "end_date": input_date.isoformat(),
+                section: HISTORICAL_VARIABLES[section],
                 "timezone": "Australia/Sydney"
             }
             
-            daily_response = requests.get(BASE_URL, params=daily_params, timeout=10)
-            daily_response.raise_for_status()
-            daily_data = daily_response.json()["daily"]
-            
-            # Hourly features for precipitation prediction (get first hour)
-            hourly_params = {
-                **SYDNEY_COORDS,
-                "start_date": input_date,
-                "end_date": input_date,
-                "hourly": [
-                    "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-                    "precipitation", "rain", "pressure_msl", "cloud_cover",
-                    "wind_speed_10m", "wind_direction_10m", "shortwave_radiation",
-                    "surface_pressure", "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high"
-                ],
-                "timezone": "Australia/Sydney"
-            }
+            data = await WeatherDataFetcher._get_json(BASE_URL, params)
+            section_data = data[section]
             
-            hourly_response = requests.get(BASE_URL, params=hourly_params, timeout=10)
-            hourly_response.raise_for_status()
-            hourly_data = hourly_response.json()["hourly"]
-            
-            # Extract single day/hour values
-            daily_features = {key: daily_data[key][0] for key in daily_data if key != "time"}
-            hourly_features = {key: hourly_data[key][0] for key in hourly_data if key != "time"}
-            
-            return {
-                "daily_features": daily_features,
-                "hourly_features": hourly_features,
-                "data_source": "historical"
-            }
+            # Extract the first day/hour values, leaving missing ones to the model defaults
+            return {key: values[0] for key, values in section_data.items() if key != "time" and values[0] is not None}
             
         except Exception as e:
             logger.error(f"Error fetching historical data: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to fetch weather data: {str(e)}")
     
     @staticmethod
-    def _fetch_forecast_data(input_date: str) -> Dict:
+    @cached_by_date(FORECAST_CACHE)
+    async def _fetch_forecast_data(input_date: date, section: str) -> Dict:
         try:
-            forecast_params = {
-                **SYDNEY_COORDS,
-                "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"],
-                "hourly": ["temperature_2m", "relative_humidity_2m", "precipitation"],
-                "timezone": "Australia/Sydney",
-                "forecast_days": 14
-            }
-            
-            response = requests.get(CURRENT_URL, params=forecast_params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            params = {**FORECAST_PARAMS, section: FORECAST_VARIABLES[section]}
+            data = await WeatherDataFetcher._get_json(CURRENT_URL, params)
+            section_data = data[section]
             
-            target_date = datetime.strptime(input_date, "%Y-%m-%d").date()
-            daily_times = [datetime.fromisoformat(t).date() for t in data["daily"]["time"]]
+            # Series are contiguous from the first (Sydney-local) day, so the
+            # target's position follows from its offset; hourly uses the first hour
+            steps_per_day = 24 if section == "hourly" else 1
+            times = section_data["time"]
+            day_offset = (input_date - date.fromisoformat(times[0][:10])).days
             
-            if target_date not in daily_times:
+            if not 0 <= day_offset < len(times) // steps_per_day:
                 raise ValueError(f"Forecast not available for {input_date}")
             
-            date_index = daily_times.index(target_date)
-            
-
-            daily_features = {}
-            for feature in data["daily"]:
-                if feature != "time":
-                    daily_features[feature] = data["daily"][feature][date_index]
-            
-            hourly_features = {}
-            hourly_start_index = date_index * 24
-            for feature in data["hourly"]:
-                if feature != "time" and hourly_start_index < len(data["hourly"][feature]):
-                    hourly_features[feature] = data["hourly"][feature][hourly_start_index]
+            index = day_offset * steps_per_day
             
             return {
-                "daily_features": daily_features,
-                "hourly_features": hourly_features,
-                "data_source": "forecast"
+                key: values[index] for key, values in section_data.items()
+                if key != "time" and index < len(values) and values[index] is not None
             }
             
         except Exception as e:
             logger.error(f"Error fetching forecast data: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to fetch forecast data: {str(e)}")
 
+class BackgroundRefresher:
+    """Keeps recent history and the 14-day forecast in memory, refetched on an interval"""
+    
+    def __init__(self, past_days: int = REFRESH_PAST_DAYS, interval_seconds: int = REFRESH_INTERVAL_SECONDS):
+        self.past_days = past_days
+        self.interval_seconds = interval_seconds
+        self.snapshot: Dict[date, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get(self, input_date: date) -> Optional[Dict]:
+        return self.snapshot.get(input_date)
+    
+    async def refresh(self):
+        today = date.today()
+        historical_params = {
+            **SYDNEY_COORDS,
+            "start_date": (today - timedelta(days=self.past_days)).isoformat(),
+            "end_date": today.isoformat(),
+            **HISTORICAL_VARIABLES,
+            "timezone": "Australia/Sydney"
+        }
+        historical, forecast = await asyncio.gather(
+            WeatherDataFetcher._get_json(BASE_URL, historical_params),
+            WeatherDataFetcher._get_json(CURRENT_URL, {**FORECAST_PARAMS, **FORECAST_VARIABLES}),
+        )
+        
+        # Same split as the live fetch: archive up to today, forecast after it
+        snapshot = self._features_by_date(historical)
+        for day, features in self._features_by_date(forecast).items():
+            if day > today:
+                snapshot[day] = features
+        self.snapshot = snapshot
+        logger.info(f"Weather snapshot refreshed with {len(snapshot)} days")
+    
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Background weather refresh failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+    
+    @staticmethod
+    def _features_by_date(data: Dict) -> Dict[date, Dict]:
+        """Split a multi-day response into per-day features, using the first hour of each day"""
+        daily_data = data["daily"]
+        hourly_data = data["hourly"]
+        
+        # Days are contiguous, so only the first date string needs parsing
+        first_day = date.fromisoformat(daily_data["time"][0])
+        features_by_date = {}
+        for date_index in range(len(daily_data["time"])):
+            hourly_start_index = date_index * 24
+            features_by_date[first_day + timedelta(days=date_index)] = {
+                "daily_features": {
+                    key: values[date_index] for key, values in daily_data.items()
+                    if key != "time" and values[date_index] is not None
+                },
+                "hourly_features": {
+                    key: values[hourly_start_index] for key, values in hourly_data.items()
+                    if key != "time" and hourly_start_index < len(values) and values[hourly_start_index] is not None
+                }
+            }
+        return features_by_date
+
+weather_refresher = BackgroundRefresher()
+
 def load_models():
-    global rain_model, precipitation_model
+    global rain_model, precipitation_model, rain_constant_prediction, precipitation_session
     
+    rain_constant_prediction = None
+    precipitation_session = None
     try:
         if os.path.exists(RAIN_MODEL_PATH):
             rain_model = joblib.load(RAIN_MODEL_PATH)
             logger.info("Rain classification model loaded successfully")
+            
+            # These dummy strategies ignore the inputs, so the answer can be computed once
+            if isinstance(rain_model, DummyClassifier) and rain_model.strategy in ("most_frequent", "prior", "constant"):
+                n_features = getattr(rain_model, "n_features_in_", len(RAIN_FEATURE_ORDER))
+                rain_constant_prediction = bool(rain_model.predict(np.zeros((1, n_features)))[0])
+                logger.info(f"Rain model is constant, always predicting will_rain={rain_constant_prediction}")
         else:
             logger.warning(f"Rain model not found at {RAIN_MODEL_PATH}")
             
         if os.path.exists(PRECIPITATION_MODEL_PATH):
             precipitation_model = joblib.load(PRECIPITATION_MODEL_PATH)
             logger.info("Precipitation regression model loaded successfully")
+            
+            if ort is not None and os.path.exists(PRECIPITATION_ONNX_PATH):
+                # An export older than the joblib file predates the last retrain
+                if os.path.getmtime(PRECIPITATION_ONNX_PATH) < os.path.getmtime(PRECIPITATION_MODEL_PATH):
+                    logger.warning(
+                        f"Ignoring stale ONNX export {PRECIPITATION_ONNX_PATH}; "
+                        "re-export with `python -m weather_forecast.export_onnx`"
+                    )
+                else:
+                    precipitation_session = ort.InferenceSession(PRECIPITATION_ONNX_PATH, providers=["CPUExecutionProvider"])
+                    logger.info("Precipitation model will run on ONNX Runtime")
         else:
             logger.warning(f"Precipitation model not found at {PRECIPITATION_MODEL_PATH}")
             
     except Exception as e:
         logger.error(f"Error loading models: {e}")
 
+def predict_precipitation_amount(X: np.ndarray) -> float:
+    """Predict with the ONNX export when available, otherwise with the sklearn model"""
+    if precipitation_session is not None:
+        return float(precipitation_session.run(None, {PRECIP_ONNX_INPUT: X})[0][0][0])
+    return float(precipitation_model.predict(X)[0])
+
 @app.on_event("startup")
 async def startup_event():
+    global http_session
     load_models()
+    # Pooled keep-alive connections so repeat calls skip the TCP/TLS handshake
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+    )
+    http_session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+    if BACKGROUND_REFRESH:
+        weather_refresher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await weather_refresher.stop()
+    if http_session is not None:
+        await http_session.close()
 
 @app.get("/")
 async def root():
@@ -217,35 +432,26 @@ async def health_check():
         "precipitation_model_loaded": precipitation_model is not None,
     }
     
-    return JSONResponse(
-        status_code=200,
-        content={
-            "status": "healthy",
-            "message": "Welcome to the Weather Prediction API! All systems operational and ready to forecast Sydney's weather.",
-            "timestamp": datetime.now().isoformat(),
-            "models": model_status
-        }
-    )
+    return {
+        "status": "healthy",
+        "message": "Welcome to the Weather Prediction API! All systems operational and ready to forecast Sydney's weather.",
+        "timestamp": datetime.now().isoformat(),
+        "models": model_status
+    }
 
 @app.get("/predict/rain/")
-async def predict_rain(date: str = Query(..., description="Date in YYYY-MM-DD format for which to predict rain 7 days ahead")):
+async def predict_rain(response: Response, input_date: Annotated[IsoDate, Query(alias="date", description="Date in YYYY-MM-DD format for which to predict rain 7 days ahead")]):
 
     if rain_model is None:
         raise HTTPException(status_code=503, detail="Rain prediction model not available")
     
     try:
-
-        try:
-            input_date_obj = datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Please use YYYY-MM-DD format (e.g., 2023-12-25)")
-        
- 
-        current_date = datetime.now()
+        # Malformed dates are rejected with 422 by FastAPI before reaching here
+        current_date = date.today()
         max_future_days = 14  
         max_past_days = 365 * 2  
         
-        days_diff = (input_date_obj - current_date).days
+        days_diff = (input_date - current_date).days
         
         if days_diff > max_future_days:
             raise HTTPException(status_code=400, detail=f"Date too far in future. Maximum {max_future_days} days ahead supported.")
@@ -254,57 +460,46 @@ async def predict_rain(date: str = Query(..., description="Date in YYYY-MM-DD fo
             raise HTTPException(status_code=400, detail=f"Date too far in past. Maximum {max_past_days} days back supported.")
         
 
-        prediction_date = (input_date_obj + timedelta(days=7)).strftime("%Y-%m-%d")
+        prediction_date = (input_date + timedelta(days=7)).isoformat()
         
+        # A constant model does not look at the weather, so skip the fetch and predict
+        if rain_constant_prediction is not None:
+            response.headers["Cache-Control"] = PREDICTION_CACHE_CONTROL
+            return {
+                "input_date": input_date.isoformat(),
+                "prediction": {
+                    "date": prediction_date,
+                    "will_rain": rain_constant_prediction
+                }
+            }
 
-        weather_data = WeatherDataFetcher.fetch_weather_for_date(date)
-        daily_features = weather_data["daily_features"]
+        daily_features = await WeatherDataFetcher.fetch_daily_for_date(input_date, current_date)
         
  
         expected_features = getattr(rain_model, 'n_features_in_', None)
         
 
-        feature_order = [
-            "temperature_2m_max", "temperature_2m_min", "temperature_2m_mean",
-            "relative_humidity_2m_max", "relative_humidity_2m_min",
-            "pressure_msl_mean", "wind_speed_10m_max", "wind_speed_10m_mean",
-            "wind_direction_10m_dominant", "precipitation_sum", "rain_sum",
-            "shortwave_radiation_sum", "daylight_duration"
-        ]
-        
-
-        features = []
-        for feature in feature_order:
-            if feature in daily_features and daily_features[feature] is not None:
-                features.append(float(daily_features[feature]))
-            else:
-
-                default_values = {
-                    "temperature_2m_max": 20.0, "temperature_2m_min": 15.0, "temperature_2m_mean": 17.5,
-                    "relative_humidity_2m_max": 80.0, "relative_humidity_2m_min": 60.0,
-                    "pressure_msl_mean": 1013.25, "wind_speed_10m_max": 10.0, "wind_speed_10m_mean": 5.0,
-                    "wind_direction_10m_dominant": 180.0, "precipitation_sum": 0.0, "rain_sum": 0.0,
-                    "shortwave_radiation_sum": 10.0, "daylight_duration": 12.0
-                }
-                features.append(default_values.get(feature, 0.0))
+        # Fetched values override the defaults; one C-level lookup pulls them in training order
+        features = RAIN_FEATURE_GETTER(RAIN_DEFAULTS | daily_features)
         
-       
         if expected_features and len(features) != expected_features:
             if len(features) > expected_features:
                 features = features[:expected_features] 
             else:
              
-                features.extend([0.0] * (expected_features - len(features)))
+                features += (0.0,) * (expected_features - len(features))
         
         logger.info(f"Using {len(features)} features for rain prediction")
         
  
-        X = np.array(features).reshape(1, -1)
-        prediction = rain_model.predict(X)[0]
+        # Tree models evaluate in float32 internally, so build that layout directly
+        X = np.fromiter(features, dtype=np.float32, count=len(features)).reshape(1, -1)
+        # Tree traversal is CPU-bound; keep it off the event loop
+        prediction = (await asyncio.to_thread(rain_model.predict, X))[0]
         
-
+        response.headers["Cache-Control"] = PREDICTION_CACHE_CONTROL
         return {
-            "input_date": date,
+            "input_date": input_date.isoformat(),
             "prediction": {
                 "date": prediction_date,
                 "will_rain": bool(prediction) 
@@ -318,24 +513,18 @@ async def predict_rain(date: str = Query(..., description="Date in YYYY-MM-DD fo
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 @app.get("/predict/precipitation/fall/")
-async def predict_precipitation(date: str = Query(..., description="Date in YYYY-MM-DD format for which to predict precipitation for next 3 days")):
+async def predict_precipitation(response: Response, input_date: Annotated[IsoDate, Query(alias="date", description="Date in YYYY-MM-DD format for which to predict precipitation for next 3 days")]):
     """Predict cumulative precipitation amount for the next 3 days"""
     if precipitation_model is None:
         raise HTTPException(status_code=503, detail="Precipitation prediction model not available")
     
     try:
-      
-        try:
-            input_date_obj = datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Please use YYYY-MM-DD format (e.g., 2023-12-25)")
-        
-     
-        current_date = datetime.now()
+        # Malformed dates are rejected with 422 by FastAPI before reaching here
+        current_date = date.today()
         max_future_days = 14 
         max_past_days = 365 * 2  # 
         
-        days_diff = (input_date_obj - current_date).days
+        days_diff = (input_date - current_date).days
         
         if days_diff > max_future_days:
             raise HTTPException(status_code=400, detail=f"Date too far in future. Maximum {max_future_days} days ahead supported.")
@@ -343,58 +532,40 @@ async def predict_precipitation(date: str = Query(..., description="Date in YYYY
         if days_diff < -max_past_days:
             raise HTTPException(status_code=400, detail=f"Date too far in past. Maximum {max_past_days} days back supported.")
         
-        start_date = (input_date_obj + timedelta(days=1)).strftime("%Y-%m-%d")
-        end_date = (input_date_obj + timedelta(days=3)).strftime("%Y-%m-%d")
+        start_date = (input_date + timedelta(days=1)).isoformat()
+        end_date = (input_date + timedelta(days=3)).isoformat()
         
     
-        weather_data = WeatherDataFetcher.fetch_weather_for_date(date)
-        hourly_features = weather_data["hourly_features"]
+        hourly_features = await WeatherDataFetcher.fetch_hourly_for_date(input_date, current_date)
         
       
         expected_features = getattr(precipitation_model, 'n_features_in_', None)
         
      
-        feature_order = [
-            "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-            "precipitation", "rain", "pressure_msl", "cloud_cover",
-            "wind_speed_10m", "wind_direction_10m", "shortwave_radiation",
-            "surface_pressure", "cloud_cover_low", "cloud_cover_mid", "cloud_cover_high"
-        ]
+        # Fetched values override the defaults; one C-level lookup pulls them in training order
+        features = PRECIP_FEATURE_GETTER(PRECIP_DEFAULTS | hourly_features)
         
-  
-        features = []
-        for feature in feature_order:
-            if feature in hourly_features and hourly_features[feature] is not None:
-                features.append(float(hourly_features[feature]))
-            else:
-   
-                default_values = {
-                    "temperature_2m": 18.0, "relative_humidity_2m": 70.0, "dew_point_2m": 12.0,
-                    "precipitation": 0.0, "rain": 0.0, "pressure_msl": 1013.25, "cloud_cover": 50.0,
-                    "wind_speed_10m": 8.0, "wind_direction_10m": 180.0, "shortwave_radiation": 200.0,
-                    "surface_pressure": 1015.0, "cloud_cover_low": 30.0, "cloud_cover_mid": 20.0, "cloud_cover_high": 10.0
-                }
-                features.append(default_values.get(feature, 0.0))
-        
-
         if expected_features and len(features) != expected_features:
             if len(features) > expected_features:
                 features = features[:expected_features]  #
             else:
                
-                features.extend([0.0] * (expected_features - len(features)))
+                features += (0.0,) * (expected_features - len(features))
         
         logger.info(f"Using {len(features)} features for precipitation prediction")
         
       
-        X = np.array(features).reshape(1, -1)
-        prediction = precipitation_model.predict(X)[0]
+        # Tree models evaluate in float32 internally, so build that layout directly
+        X = np.fromiter(features, dtype=np.float32, count=len(features)).reshape(1, -1)
+        # Tree traversal is CPU-bound; keep it off the event loop
+        prediction = await asyncio.to_thread(predict_precipitation_amount, X)
         
   
         prediction = max(0.0, float(prediction))
         
+        response.headers["Cache-Control"] = PREDICTION_CACHE_CONTROL
         return {
-            "input_date": date,
+            "input_date": input_date.isoformat(),
             "prediction": {
                 "start_date": start_date,
                 "end_date": end_date,
@@ -410,4 +581,15 @@ async def predict_precipitation(date: str = Query(..., description="Date in YYYY
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Multiple workers need the app as an import string so each process can load it;
+    # app_dir makes it resolvable however the script is started
+    uvicorn.run(
+        "weather_forecast.main:app",
+        app_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+        host="0.0.0.0",
+        port=8001,
+        workers=int(os.getenv("WEB_CONCURRENCY") or 1),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
\ No newline at end of file